@@ -37,6 +37,33 @@ def build_arg_parser() -> ArgumentParser:
     parser.add_argument('-o', '--output', metavar='DIR',
                         default='./coverage-report/',
                         help='output directory to write the HTML report.')
+    parser.add_argument('--history', metavar='DB',
+                        help='SQLite database keeping the coverage summaries '
+                             'of earlier runs.')
+    parser.add_argument('--label', metavar='RUN',
+                        help='record the summaries of this run into the '
+                             'history database under this label.')
+    parser.add_argument('--compare', metavar='RUN',
+                        help='show the changes against an earlier run from '
+                             'the history database in the index page.')
+    parser.add_argument('--hotspots', metavar='N', type=int, default=0,
+                        help='write a report of the N most executed lines, '
+                             'functions, call sites and biased branches.')
+    parser.add_argument('--bias-bounds', metavar=('LOW', 'HIGH'), type=float, nargs=2,
+                        default=(0.05, 0.95),
+                        help='a two-way branch is biased if the taken ratio of '
+                             'an outcome is outside these bounds; a multi-way '
+                             'jump if its dominant outcome is above HIGH. '
+                             '(default: 0.05 0.95)')
+    parser.add_argument('--bias-min-count', metavar='COUNT', type=int, default=100,
+                        help='ignore branches executed fewer than COUNT times '
+                             'in the biased branch report. (default: 100)')
+    parser.add_argument('--memory-limit', metavar='SIZE', type=parse_size,
+                        help='estimated memory budget (e.g. 512M) for the '
+                             'unmerged partial results parsed from *.gcov files. '
+                             'When exceeded, they are spilled to disk and merged '
+                             'afterwards. The merge itself and the rendering of '
+                             'each file are not counted.')
     parser.add_argument('gcno_root', metavar='GCNO_ROOT',
                         help='the root directory to search for *.gcno files. ')
     parser.add_argument('compile_root', metavar='COMPILE_ROOT',
@@ -51,13 +78,30 @@ def main() -> int:
 
     parser = build_arg_parser()
     args = parser.parse_args()
+    if (args.label or args.compare) and not args.history:
+        parser.error('--label and --compare require --history')
+    (bias_low, bias_high) = args.bias_bounds
+    if not 0 <= bias_low <= bias_high <= 1:
+        parser.error('--bias-bounds must satisfy 0 <= LOW <= HIGH <= 1')
+    abs_history = abspath(args.history) if args.history else None
     abs_compile_root = abspath(args.compile_root)
+
+    baseline = None
+    if abs_history and args.compare:
+        with CoverageHistory(abs_history) as history:
+            baseline = history.load(args.compare)
+        if baseline is None:
+            print('\033[1;31m==> 711cov:\033[0m No run named', args.compare, 'in history')
+            return 1
+
     gcno_files = find_with_ext(args.gcno_root, args.compile_root, '.gcno')
     res_dir = gcov(args.gcov, args.compile_root, gcno_files)
     if not res_dir:
         return 1
 
-    gcovs = list(collect_gcov(res_dir, abs_compile_root))
+    hotspots = None
+    if args.hotspots > 0:
+        hotspots = HotSpots(args.hotspots, bias_low, bias_high, args.bias_min_count)
 
     chdir(cwd)
     try:
@@ -66,13 +110,29 @@ def main() -> int:
         pass
     copy_sorttable_js(args.output)
     chdir(args.output)
-    with open('index.html', 'w') as f:
-        f.write(html_index(gcovs, args.compile_root))
-    for source_file in gcovs:
+
+    # Render each source file as soon as it is finalized, keeping only the
+    # summaries, so that the whole project need not be held in memory.
+    summaries = []
+    for source_file in collect_gcov(res_dir, abs_compile_root, memory_limit=args.memory_limit):
+        if hotspots:
+            hotspots.add(source_file)
+        summaries.append((source_file.source_name, source_file.summary()))
         html_file_name = to_html_filename(source_file.source_name)
         with open(html_file_name, 'w') as f:
             f.write(source_file.to_html())
 
+    hotspots_filename = 'hotspots.html' if hotspots else None
+    with open('index.html', 'w') as f:
+        f.write(html_index(summaries, args.compile_root, baseline, args.compare, hotspots_filename))
+    if hotspots:
+        with open(hotspots_filename, 'w') as f:
+            f.write(html_hotspots(hotspots, args.compile_root))
+
+    if abs_history and args.label:
+        with CoverageHistory(abs_history) as history:
+            history.record(args.label, summaries)
+
     rmtree(res_dir)
     return 0
 
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+#
+#{{{ GPLv3 #####################################################################
+#
+# 711history.py --- Query the coverage history recorded by 711cov.
+# Copyright (C) 2012  kennytm (auraHT Ltd.)
+#
+# This program is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation, either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+#
+#}}}############################################################################
+
+from argparse import ArgumentParser
+from sys import exit
+from time import strftime, localtime
+from lib711cov import CoverageHistory, diff_summaries, to_percentage, to_percentage_delta
+
+
+def build_arg_parser() -> ArgumentParser:
+    """
+    Construct an parser to parse the command line arguments.
+    """
+    parser = ArgumentParser(description='Show per-file coverage changes between runs recorded by 711cov')
+    parser.add_argument('history', metavar='DB',
+                        help='the history database written by 711cov --history.')
+    parser.add_argument('run', metavar='RUN', nargs='?',
+                        help='the run to inspect. List all runs if omitted.')
+    parser.add_argument('baseline', metavar='BASELINE', nargs='?',
+                        help='the earlier run to compare with. Defaults to the '
+                             'run recorded just before RUN.')
+    parser.add_argument('--changed-only', action='store_true',
+                        help='hide files whose displayed line, branch and '
+                             'function percentages did not change.')
+    return parser
+
+
+# The (covered, total) fields of the Lines, Branch and Functions columns.
+DISPLAYED_FIELDS = (('covered', 'lines'),
+                    ('br_covered', 'br_count'),
+                    ('fn_covered', 'fn_count'))
+
+
+def displayed_percentages(summary) -> [str]:
+    """
+    Return the line, branch and function percentages of a file as shown.
+    """
+    result = []
+    for (covered_field, total_field) in DISPLAYED_FIELDS:
+        percent = to_percentage(getattr(summary, covered_field), getattr(summary, total_field), 0, 0)[0]
+        result.append(percent if percent == '---' else percent + '%')
+    return result
+
+
+def format_row(source_name: str, current, baseline) -> [str]:
+    """
+    Format the line, branch and function percentages and changes of a file.
+    """
+    columns = [source_name]
+    if current is None:
+        for _ in DISPLAYED_FIELDS:
+            columns.extend(['---', 'removed'])
+        return columns
+
+    for ((covered_field, total_field), percent) in zip(DISPLAYED_FIELDS, displayed_percentages(current)):
+        old_pair = None
+        if baseline is not None:
+            old_pair = (getattr(baseline, covered_field), getattr(baseline, total_field))
+        covered = getattr(current, covered_field)
+        total = getattr(current, total_field)
+        columns.append(percent)
+        columns.append(to_percentage_delta(covered, total, old_pair)[0])
+    return columns
+
+
+def main() -> int:
+    parser = build_arg_parser()
+    args = parser.parse_args()
+
+    with CoverageHistory(args.history) as history:
+        runs = history.runs()
+        if not args.run:
+            for (label, created) in runs:
+                print(strftime('%Y-%m-%d %H:%M:%S', localtime(created)), label)
+            return 0
+
+        labels = [label for label, _ in runs]
+        baseline_label = args.baseline
+        if args.run not in labels:
+            print('\033[1;31m==> 711history:\033[0m No run named', args.run)
+            return 1
+        if baseline_label is None:
+            index = labels.index(args.run)
+            if index == 0:
+                print('\033[1;31m==> 711history:\033[0m No run recorded before', args.run)
+                return 1
+            baseline_label = labels[index - 1]
+
+        current = history.load(args.run)
+        baseline = history.load(baseline_label)
+        for (label, summaries) in ((args.run, current), (baseline_label, baseline)):
+            if summaries is None:
+                print('\033[1;31m==> 711history:\033[0m No run named', label)
+                return 1
+
+    rows = [['File', 'Lines', 'Δ', 'Branch', 'Δ', 'Functions', 'Δ']]
+    for (source_name, cur, old) in diff_summaries(current, baseline):
+        if (args.changed_only and cur is not None and old is not None and
+                displayed_percentages(cur) == displayed_percentages(old)):
+            continue
+        rows.append(format_row(source_name, cur, old))
+
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    print('\033[1;34m==> 711history:\033[0m', args.run, 'compared with', baseline_label)
+    for row in rows:
+        print(row[0].ljust(widths[0]), *(c.rjust(w) for c, w in zip(row[1:], widths[1:])))
+    return 0
+
+
+if __name__ == '__main__':
+    err_code = main()
+    exit(err_code)
@@ -20,15 +20,20 @@
 #}}}############################################################################
 
 from sys import exit
-from os import walk, chdir, listdir, getcwd
-from os.path import splitext, join, abspath, relpath, dirname
-from tempfile import mkdtemp
+from os import walk, chdir, listdir, getcwd, remove
+from os.path import splitext, join, abspath, relpath, dirname, getsize
+from tempfile import mkdtemp, mkstemp
 from subprocess import check_call, Popen, PIPE
-from shutil import move, copy
-from collections import defaultdict
+from shutil import move, copy, rmtree
+from collections import defaultdict, namedtuple
 from html import escape
 from urllib.parse import quote
+from time import time
+from heapq import heappush, heapreplace, merge
+from operator import attrgetter
+import pickle
 import re
+import sqlite3
 
 
 def find_with_ext(abs_root: str, compile_root: str, ext: str) -> iter([str]):
@@ -88,6 +93,12 @@ def unmangle_gcov_filename(gcov_filename: str):
     return gcov_filename.replace('^', '..').replace('#', '/').replace('~', ':')
 
 
+FileSummary = namedtuple('FileSummary', ['covered', 'lines',
+                                         'br_covered', 'br_count',
+                                         'calls_covered', 'calls_count',
+                                         'fn_covered', 'fn_count'])
+
+
 class SourceBranch(object):
     """
     Represents a branch in a source line.
@@ -201,7 +212,7 @@ class SourceLine(object):
                 self.coverage = other.coverage
             else:
                 self.coverage += other.coverage
-        for branch in other.values():
+        for branch in other.branches.values():
             self.add_branch(branch)
 
     def add_branch(self, branch: SourceBranch) -> None:
@@ -254,6 +265,19 @@ class SourceFunction(object):
         self.blocks = max(self.blocks, other.blocks)
 
 
+def demangle_cpp_names(names: iter([str])) -> [str]:
+    """
+    Decode the mangled C++ names using 'c++filt'.
+    """
+    result = []
+    with Popen(['c++filt'], stdin=PIPE, stdout=PIPE, universal_newlines=True) as proc:
+        for name in names:
+            proc.stdin.write(name + '\n')
+            proc.stdin.flush()
+            result.append(proc.stdout.readline().rstrip('\n\r'))
+    return result
+
+
 class SourceFile(object):
     """
     Represents a source file.
@@ -291,6 +315,20 @@ class SourceFile(object):
                     continue
 
         # Step 2: Combine.
+        self.combine_parsed(source_lines, source_functions)
+
+    def combine(self, other) -> None:
+        """
+        Combine this with another SourceFile object representing the same source.
+        """
+        assert self.source_name == other.source_name
+        self.combine_parsed(other.source_code, other.source_functions)
+
+    def combine_parsed(self, source_lines: [SourceLine], source_functions: [SourceFunction]) -> None:
+        """
+        Combine the lines and functions parsed from another *.gcov file into
+        this source file.
+        """
         if self.source_code:
             for orig, new in zip(self.source_code, source_lines):
                 orig.combine(new)
@@ -330,15 +368,19 @@ class SourceFile(object):
         funcs = len(self.source_functions)
         return (covered, funcs)
 
+    def summary(self) -> FileSummary:
+        """
+        Return the line, branch, call and function statistics in one record.
+        """
+        return FileSummary(*(self.coverage_stats() + self.branch_stats() + self.function_stats()))
+
     def decode_cpp_function_names(self) -> None:
         """
         Decode the C++ function names.
         """
-        with Popen(['c++filt'], stdin=PIPE, stdout=PIPE, universal_newlines=True) as proc:
-            for func in self.source_functions:
-                proc.stdin.write(func.name + '\n')
-                proc.stdin.flush()
-                func.pretty_name = proc.stdout.readline().rstrip('\n\r')
+        pretty_names = demangle_cpp_names(func.name for func in self.source_functions)
+        for func, pretty_name in zip(self.source_functions, pretty_names):
+            func.pretty_name = pretty_name
 
     def to_html(self) -> str:
         """
@@ -437,27 +479,147 @@ class SourceFile(object):
         return '\n'.join(result)
 
 
-def collect_gcov(gcov_dir: str, abs_compile_root: str, ignored_prefixes = ('/usr',)) -> iter([SourceFile]):
+# Upper bound of the ratio between the memory taken by a parsed SourceFile and
+# the size of the *.gcov files it is parsed from. Measured with tracemalloc on
+# CPython 3.11: files with long source lines take about 4x, branch- and
+# call-heavy files 8-11x, and the worst case, a file of empty source lines,
+# 12x (about 205 bytes per SourceLine parsed from 17 bytes of text).
+PARSED_GCOV_SIZE_FACTOR = 12
+
+
+def parse_size(size_str: str) -> int:
     """
-    Collect all *.gcov files inside 'gcov_dir', but ignore those with a path
-    starting with 'ignored_prefixes'.
+    Parse a size like "512M" or "2G" into number of bytes.
     """
-    res_dict = defaultdict(SourceFile)
-    for filename in listdir(gcov_dir):
-        (fn, ext) = splitext(filename)
-        if ext != '.gcov':
-            continue
+    units = {'': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+    match = re.fullmatch(r'\s*(\d+(?:\.\d*)?)\s*([KMGT]?)i?B?\s*', size_str, re.I)
+    if not match:
+        raise ValueError('invalid size: ' + repr(size_str))
+    return int(float(match.group(1)) * units[match.group(2).upper()])
+
 
-        source_fn = unmangle_gcov_filename(fn)
-        if source_fn.startswith(ignored_prefixes):
-            continue
+def write_run(run_dir: str, source_files: iter([SourceFile])) -> str:
+    """
+    Write source files, already sorted by name, into a new run file inside
+    'run_dir'. Returns the file name of the run.
+    """
+    (fd, run_filename) = mkstemp(suffix='.run', dir=run_dir)
+    with open(fd, 'wb') as f:
+        for source_file in source_files:
+            pickle.dump(source_file, f, pickle.HIGHEST_PROTOCOL)
+    return run_filename
 
-        rel_source_fn = relpath(source_fn, start=abs_compile_root)
-        res_dict[rel_source_fn].add(join(gcov_dir, filename))
 
-    for source_name, source_file in sorted(res_dict.items()):
+def spill_run(run_dir: str, res_dict: {str: SourceFile}) -> str:
+    """
+    Spill the partial results into a new sorted run file inside 'run_dir'.
+    """
+    for source_name, source_file in res_dict.items():
         source_file.source_name = source_name
-        yield source_file
+    return write_run(run_dir, (source_file for _, source_file in sorted(res_dict.items())))
+
+
+def read_run(run_filename: str) -> iter([SourceFile]):
+    """
+    Read back the source files from a run file written by 'write_run'.
+    """
+    with open(run_filename, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def merge_runs(run_filenames: [str]) -> iter([SourceFile]):
+    """
+    Merge the run files by source name, combining the partial results of the
+    same source file.
+    """
+    current = None
+    for source_file in merge(*map(read_run, run_filenames), key=attrgetter('source_name')):
+        if current is None:
+            current = source_file
+        elif current.source_name == source_file.source_name:
+            current.combine(source_file)
+        else:
+            yield current
+            current = source_file
+    if current is not None:
+        yield current
+
+
+# Maximum number of run files opened at once when merging.
+MERGE_FAN_IN = 16
+
+
+def collect_gcov(gcov_dir: str, abs_compile_root: str, ignored_prefixes = ('/usr',),
+                 memory_limit: int or None = None, fan_in: int = MERGE_FAN_IN) -> iter([SourceFile]):
+    """
+    Collect all *.gcov files inside 'gcov_dir', but ignore those with a path
+    starting with 'ignored_prefixes'.
+
+    If 'memory_limit' (in bytes) is given, partial results are spilled to
+    sorted run files on disk whenever the estimated memory usage exceeds the
+    limit. The runs are then merged by source name, at most 'fan_in' runs at
+    a time, so that only one partial result per open run and one finalized
+    source file are held in memory.
+    """
+    res_dict = defaultdict(SourceFile)
+    run_dir = None
+    run_filenames = []
+    held_size = 0
+    try:
+        for filename in listdir(gcov_dir):
+            (fn, ext) = splitext(filename)
+            if ext != '.gcov':
+                continue
+
+            source_fn = unmangle_gcov_filename(fn)
+            if source_fn.startswith(ignored_prefixes):
+                continue
+
+            rel_source_fn = relpath(join(abs_compile_root, source_fn), start=abs_compile_root)
+            gcov_filename = join(gcov_dir, filename)
+            res_dict[rel_source_fn].add(gcov_filename)
+
+            if memory_limit is None:
+                continue
+            held_size += getsize(gcov_filename) * PARSED_GCOV_SIZE_FACTOR
+            if held_size > memory_limit:
+                if run_dir is None:
+                    run_dir = mkdtemp(prefix='711cov_runs_')
+                run_filenames.append(spill_run(run_dir, res_dict))
+                res_dict.clear()
+                held_size = 0
+
+        if not run_filenames:
+            for source_name, source_file in sorted(res_dict.items()):
+                source_file.source_name = source_name
+                yield source_file
+            return
+
+        if res_dict:
+            run_filenames.append(spill_run(run_dir, res_dict))
+        res_dict = None
+
+        # Multi-pass k-way merge, opening at most 'fan_in' runs at a time.
+        while len(run_filenames) > fan_in:
+            merged_filenames = []
+            for i in range(0, len(run_filenames), fan_in):
+                group = run_filenames[i:i + fan_in]
+                if len(group) == 1:
+                    merged_filenames.extend(group)
+                    continue
+                merged_filenames.append(write_run(run_dir, merge_runs(group)))
+                for run_filename in group:
+                    remove(run_filename)
+            run_filenames = merged_filenames
+
+        yield from merge_runs(run_filenames)
+    finally:
+        if run_dir is not None:
+            rmtree(run_dir)
 
 
 def to_html_filename(source_file_name: str) -> str:
@@ -506,33 +668,99 @@ def to_percentage(covered: int, total: int, good_percent: float, normal_percent:
     return (coverage_percent, coverage_health)
 
 
-def html_index(source_files: iter([SourceFile]), compile_root: str) -> str:
+def to_percentage_delta(covered: int, total: int, old_summary_pair: (int, int) or None) -> (str, str):
     """
-    Generate the index page to the coverage reports.
+    Compute the change of coverage percentage (in percentage points) against
+    an earlier run. Returns the text and the CSS class of the change.
     """
-    def single_summary(source_file: SourceFile) -> str:
-        (covered, lines) = source_file.coverage_stats()
-        (br_covered, br_count, _, _) = source_file.branch_stats()
-        (fn_covered, fn_count) = source_file.function_stats()
-        (coverage_percent, coverage_health) = to_percentage(covered, lines, 90, 75)
-        (branch_percent, branch_health) = to_percentage(br_covered, br_count, 75, 50)
-        (fn_percent, fn_health) = to_percentage(fn_covered, fn_count, 90, 75)
+    if old_summary_pair is None:
+        return ('new', 'new')
+    (old_covered, old_total) = old_summary_pair
+    if total == 0 or old_total == 0:
+        return ('---', 'na')
 
+    delta = (100 * covered) / total - (100 * old_covered) / old_total
+    delta_str = '{:+.2f}'.format(delta)
+    if delta_str in ('+0.00', '-0.00'):
+        return ('0.00', 'same')
+    elif delta > 0:
+        return (delta_str, 'up')
+    else:
+        return (delta_str, 'down')
+
+
+def html_index(summaries: iter([(str, FileSummary)]), compile_root: str,
+               baseline: {str: FileSummary} or None = None,
+               baseline_label: str = '',
+               hotspots_filename: str or None = None) -> str:
+    """
+    Generate the index page to the coverage reports. If a 'baseline' from the
+    coverage history is given, the change of each percentage is shown as well.
+    If 'hotspots_filename' is given, a link to the hot-spot report is added.
+    """
+    def single_summary(source_name: str, summary: FileSummary or None, old: FileSummary or None) -> str:
+        if summary is None:
+            # The file existed in the baseline but has been removed since.
+            html_cells = []
+            for (covered, total) in ((old.covered, old.lines),
+                                     (old.br_covered, old.br_count),
+                                     (old.fn_covered, old.fn_count)):
+                html_cells.append('<td class="cov-health-na">---</td>')
+                html_cells.append('<td class="delta-removed" title="{}/{}">removed</td>'.format(covered, total))
+            return '''<tr class="removed">
+                    <td>{}</td>
+                    {}
+                  </tr>'''.format(
+                escape(source_name),
+                '\n                    '.join(html_cells)
+            )
+
+        (coverage_percent, coverage_health) = to_percentage(summary.covered, summary.lines, 90, 75)
+        (branch_percent, branch_health) = to_percentage(summary.br_covered, summary.br_count, 75, 50)
+        (fn_percent, fn_health) = to_percentage(summary.fn_covered, summary.fn_count, 90, 75)
+
+        cells = [
+            (coverage_health, summary.covered, summary.lines, coverage_percent),
+            (branch_health, summary.br_covered, summary.br_count, branch_percent),
+            (fn_health, summary.fn_covered, summary.fn_count, fn_percent),
+        ]
+        old_pairs = [None] * 3 if old is None else [
+            (old.covered, old.lines),
+            (old.br_covered, old.br_count),
+            (old.fn_covered, old.fn_count),
+        ]
+
+        html_cells = []
+        for i, (health, covered, total, percent) in enumerate(cells):
+            html_cells.append('<td class="cov-health-{}" title="{}/{}">{}%</td>'.format(
+                health, covered, total, percent
+            ))
+            if baseline is not None:
+                (delta, delta_class) = to_percentage_delta(covered, total, old_pairs[i])
+                title = '' if old_pairs[i] is None else '{}/{}'.format(*old_pairs[i])
+                html_cells.append('<td class="delta-{}" title="{}">{}</td>'.format(
+                    delta_class, title, delta
+                ))
 
         return '''<tr>
                     <td><a href="{}">{}</a></td>
-                    <td class="cov-health-{}" title="{}/{}">{}%</td>
-                    <td class="cov-health-{}" title="{}/{}">{}%</td>
-                    <td class="cov-health-{}" title="{}/{}">{}%</td>
+                    {}
                   </tr>'''.format(
-            to_html_filename(source_file.source_name),
-            escape(source_file.source_name),
-            coverage_health, covered, lines, coverage_percent,
-            branch_health, br_covered, br_count, branch_percent,
-            fn_health, fn_covered, fn_count, fn_percent
+            to_html_filename(source_name),
+            escape(source_name),
+            '\n                    '.join(html_cells)
         )
 
     title = escape(compile_root)
+    if baseline is None:
+        headers = '<th>File</th><th>Lines</th><th>Branch</th><th>Functions</th>'
+        compare_html = ''
+    else:
+        headers = ('<th>File</th><th>Lines</th><th>&Delta;</th><th>Branch</th>'
+                   '<th>&Delta;</th><th>Functions</th><th>&Delta;</th>')
+        compare_html = '<p>Changes are compared with run <b>' + escape(baseline_label) + '</b>.</p>'
+    if hotspots_filename:
+        compare_html += '<p><a href="' + quote(hotspots_filename) + '">Hot spots and biased branches</a></p>'
 
     html_res = ["""
     <!DOCTYPE html>
@@ -546,6 +774,12 @@ def html_index(source_files: iter([SourceFile]), compile_root: str) -> str:
     .cov-health-good { background-color: yellow; }
     .cov-health-normal { background-color: orange; }
     .cov-health-bad { background-color: red; }
+    .delta-up { color: green; }
+    .delta-down { color: red; }
+    .delta-same, .delta-na { color: silver; }
+    .delta-new { color: blue; }
+    .delta-removed, .removed td:first-child { color: gray; }
+    .removed td:first-child { text-decoration: line-through; }
     td { text-align: right; padding: 0.1em 0.5em; }
     td:first-child { text-align: left; }
     table { border-collapse: collapse; }
@@ -556,16 +790,296 @@ def html_index(source_files: iter([SourceFile]), compile_root: str) -> str:
     </head>
     <body>
     <h1>Coverage report for """ + title + """</h1>
+    """ + compare_html + """
     <div><table class="sortable">
-    <thead><tr><th>File</th><th>Lines</th><th>Branch</th><th>Functions</th></tr></thead>
+    <thead><tr>""" + headers + """</tr></thead>
     <tbody>
     """]
 
-    html_res.extend(single_summary(s) for s in source_files)
+    if baseline is None:
+        html_res.extend(single_summary(name, summary, None) for name, summary in summaries)
+    else:
+        html_res.extend(single_summary(name, summary, old)
+                        for name, summary, old in diff_summaries(dict(summaries), baseline))
     html_res.append('</tbody></table></div></body></html>')
 
     return '\n'.join(html_res)
 
 
+class CoverageHistory(object):
+    """
+    A local SQLite database keeping the per-file summaries of every run, keyed
+    by a run label. Only the summaries are stored, never the raw gcov data.
+    """
+    def __init__(self, db_filename: str):
+        self.conn = sqlite3.connect(db_filename)
+        columns = ''.join(',\n                {} INTEGER NOT NULL'.format(f) for f in FileSummary._fields)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                id INTEGER PRIMARY KEY,
+                label TEXT UNIQUE NOT NULL,
+                created REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS summaries (
+                run_id INTEGER NOT NULL REFERENCES runs(id),
+                source_name TEXT NOT NULL""" + columns + """,
+                PRIMARY KEY (run_id, source_name)
+            );
+        """)
+
+    def close(self) -> None:
+        self.conn.close()
 
+    def __enter__(self):
+        return self
 
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def record(self, label: str, summaries: iter([(str, FileSummary)])) -> None:
+        """
+        Store the summaries of a run. An existing run with the same label is
+        replaced.
+        """
+        placeholders = ', '.join('?' * (len(FileSummary._fields) + 2))
+        with self.conn:
+            self.conn.execute('DELETE FROM summaries WHERE run_id IN (SELECT id FROM runs WHERE label = ?)', (label,))
+            self.conn.execute('DELETE FROM runs WHERE label = ?', (label,))
+            run_id = self.conn.execute('INSERT INTO runs (label, created) VALUES (?, ?)', (label, time())).lastrowid
+            self.conn.executemany('INSERT INTO summaries VALUES (' + placeholders + ')',
+                                  ((run_id, name) + tuple(summary) for name, summary in summaries))
+
+    def runs(self) -> [(str, float)]:
+        """
+        List the labels and creation times of all recorded runs, oldest first.
+        """
+        return self.conn.execute('SELECT label, created FROM runs ORDER BY created, id').fetchall()
+
+    def load(self, label: str) -> {str: FileSummary} or None:
+        """
+        Load the summaries of a run. Returns None if the run does not exist.
+        """
+        row = self.conn.execute('SELECT id FROM runs WHERE label = ?', (label,)).fetchone()
+        if row is None:
+            return None
+        cursor = self.conn.execute('SELECT source_name, ' + ', '.join(FileSummary._fields) +
+                                   ' FROM summaries WHERE run_id = ?', row)
+        return {r[0]: FileSummary(*r[1:]) for r in cursor}
+
+
+def diff_summaries(current: {str: FileSummary}, baseline: {str: FileSummary}) -> iter([(str, FileSummary or None, FileSummary or None)]):
+    """
+    Pair up the summaries of two runs by source name. A file missing from
+    either run is paired with None.
+    """
+    for source_name in sorted(current.keys() | baseline.keys()):
+        yield (source_name, current.get(source_name), baseline.get(source_name))
+
+
+def push_bounded(heap: list, limit: int, item: tuple) -> None:
+    """
+    Push an item into a min-heap holding at most 'limit' items, evicting the
+    smallest item when it is full. The heap thus keeps the 'limit' largest
+    items seen so far.
+    """
+    if len(heap) < limit:
+        heappush(heap, item)
+    elif heap and item > heap[0]:
+        heapreplace(heap, item)
+
+
+def split_jump_run(run: [SourceBranch]) -> [[SourceBranch]]:
+    """
+    Split a run of branch outcomes with consecutive ids into conditional jumps.
+    An ordinary conditional has exactly two outcomes, one of which is marked
+    "fallthrough" (either one may come first), while a switch or computed
+    jump has two or more outcomes and no fallthrough. The split with the
+    fewest jumps is chosen; outcomes fitting neither form are left alone.
+    """
+    def is_fallthrough(b: SourceBranch) -> bool:
+        return b.info == 'fallthrough'
+
+    # best[i] = (cost, start of the last group) for splitting run[:i].
+    unpaired_cost = len(run) + 1
+    best = [(0, 0)]
+    for end in range(1, len(run) + 1):
+        candidates = []
+        if end >= 2 and is_fallthrough(run[end - 2]) != is_fallthrough(run[end - 1]):
+            candidates.append((best[end - 2][0] + 1, end - 2))
+        start = end - 1
+        while start > 0 and not is_fallthrough(run[start - 1]) and not is_fallthrough(run[end - 1]):
+            start -= 1
+            candidates.append((best[start][0] + 1, start))
+        candidates.append((best[end - 1][0] + unpaired_cost, end - 1))
+        best.append(min(candidates, key=lambda c: c[0]))
+
+    jumps = []
+    end = len(run)
+    while end > 0:
+        start = best[end][1]
+        if end - start >= 2:
+            jumps.append(run[start:end])
+        end = start
+    jumps.reverse()
+    return jumps
+
+
+def group_conditional_jumps(branches: [SourceBranch]) -> [[SourceBranch]]:
+    """
+    Group the branch outcomes of a line into the conditional jumps they belong
+    to. gcov numbers the outcomes of a jump with consecutive ids, and marks
+    the fallthrough outcome of every ordinary conditional.
+    """
+    runs = []
+    for b in sorted(branches, key=attrgetter('id_')):
+        if runs and runs[-1][-1].id_ + 1 == b.id_:
+            runs[-1].append(b)
+        else:
+            runs.append([b])
+
+    jumps = []
+    for run in runs:
+        jumps.extend(split_jump_run(run))
+    return jumps
+
+
+class HotSpots(object):
+    """
+    Tracks the most executed lines, functions and call sites, and the most
+    executed conditional jumps whose taken ratio is heavily biased, across all
+    source files. Call sites are ranked by the execution count of their line,
+    since gcov only counts how many times a call returned. Only the top-N
+    items are kept, so source files can be fed one at a time as they are
+    collected.
+    """
+    def __init__(self, limit: int, bias_low: float = 0.05, bias_high: float = 0.95,
+                 bias_min_count: int = 100):
+        self.limit = limit
+        self.bias_low = bias_low
+        self.bias_high = bias_high
+        self.bias_min_count = bias_min_count
+        self.lines = []
+        self.functions = []
+        self.calls = []
+        self.biased_branches = []
+
+    def add(self, source_file: SourceFile) -> None:
+        """
+        Account the execution counts of a source file.
+        """
+        source_name = source_file.source_name
+        limit = self.limit
+        for line in source_file.source_code:
+            if line.coverage > 0:
+                push_bounded(self.lines, limit, (line.coverage, source_name, line.linenum, line.source))
+
+            branches = []
+            for b in line.branches.values():
+                if b.type_ == 'branch':
+                    branches.append(b)
+                elif line.coverage > 0:
+                    push_bounded(self.calls, limit,
+                                 (line.coverage, source_name, line.linenum, b.id_, b.count, line.source))
+
+            for jump in group_conditional_jumps(branches):
+                total = sum(b.count for b in jump)
+                if total < self.bias_min_count:
+                    continue
+                # A multi-way jump is only predictable if one outcome dominates,
+                # so rare outcomes count towards the bias of two-way jumps only.
+                dominant = max(jump, key=attrgetter('count'))
+                ratio = dominant.count / total
+                if ratio <= self.bias_high and (len(jump) > 2 or 1 - ratio >= self.bias_low):
+                    continue
+                push_bounded(self.biased_branches, limit,
+                             (total, source_name, line.linenum, jump[0].id_, jump[-1].id_,
+                              dominant.id_, dominant.count, dominant.info or '', line.source))
+
+        for func in source_file.source_functions:
+            if func.called > 0:
+                push_bounded(self.functions, limit, (func.called, source_name, func.linenum, func.name))
+
+    def top_lines(self) -> [tuple]:
+        return sorted(self.lines, reverse=True)
+
+    def top_functions(self) -> [tuple]:
+        return sorted(self.functions, reverse=True)
+
+    def top_calls(self) -> [tuple]:
+        return sorted(self.calls, reverse=True)
+
+    def top_biased_branches(self) -> [tuple]:
+        return sorted(self.biased_branches, reverse=True)
+
+
+def html_hotspots(hotspots: HotSpots, compile_root: str) -> str:
+    """
+    Generate the hot-spot and branch-bias report page.
+    """
+    def location(source_name: str, linenum: int) -> str:
+        return '<a href="{}#line-{}">{}:{}</a>'.format(
+            to_html_filename(source_name), linenum, escape(source_name), linenum
+        )
+
+    def table(caption: str, headers: [str], rows: iter([[str]])) -> str:
+        res = ['<h2>' + caption + '</h2>',
+               '<div><table class="sortable">',
+               '<thead><tr>' + ''.join('<th>' + h + '</th>' for h in headers) + '</tr></thead>',
+               '<tbody>']
+        res.extend('<tr>' + ''.join('<td>' + c + '</td>' for c in row) + '</tr>' for row in rows)
+        res.append('</tbody></table></div>')
+        return '\n'.join(res)
+
+    functions = hotspots.top_functions()
+    pretty_names = demangle_cpp_names(f[3] for f in functions)
+
+    title = escape(compile_root)
+    html_res = ["""
+    <!DOCTYPE html>
+    <html>
+    <head>
+    <meta charset="utf-8">
+    <title>Hot spots of """ + title + """</title>
+    <style type="text/css">
+    /*<![CDATA[*/
+    td { text-align: right; padding: 0.1em 0.5em; }
+    td:first-child, td:last-child { text-align: left; }
+    td:last-child { font-family: monospace; white-space: pre; }
+    table { border-collapse: collapse; }
+    tr { border: 1px solid black; }
+    /*]]>*/
+    </style>
+    <script src="sorttable.js"></script>
+    </head>
+    <body>
+    <p><a href="index.html">&lArr; Back</a></p>
+    <h1>Hot spots of """ + title + """</h1>
+    """]
+
+    html_res.append(table('Most executed lines', ['Location', 'Count', 'Source'], (
+        [location(name, linenum), str(count), escape(source)]
+        for (count, name, linenum, source) in hotspots.top_lines()
+    )))
+    html_res.append(table('Most called functions', ['Location', 'Calls', 'Function'], (
+        [location(name, linenum), str(count), escape(pretty_name)]
+        for ((count, name, linenum, _), pretty_name) in zip(functions, pretty_names)
+    )))
+    html_res.append(table('Most executed call sites (by line execution count)',
+                          ['Location', 'Call', 'Executed', 'Returned', 'Source'], (
+        [location(name, linenum), str(id_), str(count), str(returned), escape(source)]
+        for (count, name, linenum, id_, returned, source) in hotspots.top_calls()
+    )))
+    html_res.append(table(
+        'Biased branches (taken ratio outside {:.2%} &ndash; {:.2%}, at least {} executions)'.format(
+            hotspots.bias_low, hotspots.bias_high, hotspots.bias_min_count
+        ),
+        ['Location', 'Branches', 'Dominant', 'Taken', 'Total', 'Ratio', 'Info', 'Source'], (
+            [location(name, linenum), '{}&ndash;{}'.format(first_id, last_id), str(id_),
+             str(count), str(total), '{:.2%}'.format(count / total), escape(info), escape(source)]
+            for (total, name, linenum, first_id, last_id, id_, count, info, source)
+            in hotspots.top_biased_branches()
+        )
+    ))
+    html_res.append('</body></html>')
+
+    return '\n'.join(html_res)